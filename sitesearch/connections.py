@@ -1,9 +1,10 @@
 import os
 import logging
+from functools import lru_cache
 
 from dotenv import load_dotenv
 from aioredis import Redis as AsyncRedis
-from redis import Redis
+from redis import ConnectionPool, Redis
 from redisearch import Client
 
 load_dotenv()
@@ -12,21 +13,49 @@ REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD')
 REDIS_HOST = os.environ.get('REDIS_HOST')
 REDIS_PORT = os.environ.get('REDIS_PORT', 6379)
 RETRY_COUNT = 3
+MAX_CONNECTIONS = 64
+HEALTH_CHECK_INTERVAL = 30  # Seconds
 
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def get_connection_pool(password=REDIS_PASSWORD,
+                        host=REDIS_HOST,
+                        port=REDIS_PORT,
+                        decode_responses=True) -> ConnectionPool:
+    """
+    Return the shared connection pool for a set of connection arguments.
+
+    Every Redis client we hand out for the same arguments draws from the
+    same pool, so callers reuse open (and authenticated) connections
+    instead of opening a new one for every client.
+
+    Before reusing a connection that has been idle for longer than
+    HEALTH_CHECK_INTERVAL, redis-py pings it, so a connection that died
+    while idle is reconnected before we send a command over it.
+    """
+    return ConnectionPool(password=password,
+                          host=host,
+                          port=port,
+                          decode_responses=decode_responses,
+                          max_connections=MAX_CONNECTIONS,
+                          retry_on_timeout=True,
+                          socket_keepalive=True,
+                          health_check_interval=HEALTH_CHECK_INTERVAL,
+                          socket_connect_timeout=1,
+                          socket_timeout=1)
+
+
 def get_redis_connection(password=REDIS_PASSWORD,
                          host=REDIS_HOST,
                          port=REDIS_PORT,
                          decode_responses=True):
-    return Redis(password=password,
-                 host=host,
-                 port=port,
-                 decode_responses=decode_responses,
-                 retry_on_timeout=True,
-                 socket_connect_timeout=1,
-                 socket_timeout=1)
+    pool = get_connection_pool(password=password,
+                               host=host,
+                               port=port,
+                               decode_responses=decode_responses)
+    return Redis(connection_pool=pool)
 
 
 def get_async_redis_connection(password=REDIS_PASSWORD,
@@ -1,19 +1,16 @@
 import datetime
-import json
 import hashlib
 import logging
-import multiprocessing
+import re
 import time
-from dataclasses import asdict
-from queue import Queue
-from threading import Thread
-from typing import Dict, List, Callable, Set
+from typing import Dict, List, Callable, Optional, Pattern, Sequence, Set, Tuple
 from redis import ResponseError
 
 import redis.exceptions
+import ujson
 from redisearch.query import Query
 import scrapy
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup, SoupStrainer, element
 from redisearch import Client, IndexDefinition
 from scrapy import signals
 from scrapy.linkextractors import LinkExtractor
@@ -28,13 +25,16 @@ from sitesearch.models import SearchDocument, SiteConfiguration, TYPE_PAGE, TYPE
 from sitesearch.query_parser import TokenEscaper
 
 ROOT_PAGE = "Redis Labs Documentation"
-MAX_THREADS = multiprocessing.cpu_count() * 5
+BATCH_SIZE = 256
 DEBOUNCE_SECONDS = 60 * 5  # Five minutes
 SYNUPDATE_COMMAND = 'FT.SYNUPDATE'
 TWO_HOURS = 60*60*2
 INDEXING_LOCK_TIMEOUT = 60*60*2
 SECTION_ID = "{url}:section:{hash}"
 PAGE_ID = "{url}:page:{hash}"
+SIMPLE_SELECTOR_RE = re.compile(r"^([.#]?)([\w-]+)$")
+# Map line breaks and tabs in page text to spaces in one str.translate() pass.
+WHITESPACE_TO_SPACES = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
 
 Scorer = Callable[[SearchDocument, float], None]
 ScorerList = List[Scorer]
@@ -76,12 +76,126 @@ class DebounceError(Exception):
     """The indexing debounce threshold was not met"""
 
 
-def next_element(elem):
-    """Get sibling elements until we exhaust them."""
-    while elem is not None:
-        elem = elem.next_sibling
-        if hasattr(elem, 'name'):
-            return elem
+def element_text(elem) -> str:
+    """
+    Get the text of a parsed element without re-parsing its HTML.
+
+    Like `Tag.get_text()`, this skips comments, doctypes, and other
+    strings that aren't page text.
+    """
+    if isinstance(elem, element.Tag):
+        return elem.get_text()
+    if type(elem) in (element.NavigableString, element.CData):
+        return str(elem)
+    return ""
+
+
+def section_texts(headers: List[element.Tag]) -> List[str]:
+    """
+    Get the text of the section that follows each header element.
+
+    A header's section is made up of the sibling elements after it, up
+    to the next H2. Instead of walking forward from every header, we walk
+    the children of each header's parent once, reading the text of each
+    child a single time and adding it to every section that is still
+    open at that point. (With H3 headers, sections run on past the next
+    H3, so a child can belong to more than one section.)
+    """
+    sections: Dict[int, List[str]] = {id(header): [] for header in headers}
+    seen_parents: Set[int] = set()
+
+    for header in headers:
+        parent = header.parent
+        if id(parent) in seen_parents:
+            continue
+        seen_parents.add(id(parent))
+
+        open_sections: List[List[str]] = []
+        for child in parent.children:
+            if child.name == 'h2':
+                open_sections = []
+            elif open_sections:
+                text = element_text(child)
+                for section in open_sections:
+                    section.append(text)
+            if id(child) in sections:
+                open_sections.append(sections[id(child)])
+
+    return ['\n'.join(sections[id(header)]) for header in headers]
+
+
+def content_strainer(content_classes: Sequence[str]) -> Optional[SoupStrainer]:
+    """
+    Build a SoupStrainer that keeps only a page's title and main content.
+
+    Parsing with the strainer skips building the parts of the tree that
+    we never read -- navigation, scripts, footers, and so on. SoupStrainer
+    can only match a tag while parsing by its name and attributes, so we
+    return None (meaning: parse the whole page) unless every content
+    selector is a single class, ID, or tag name.
+    """
+    if not content_classes:
+        return None
+
+    names = {'title'}
+    ids = set()
+    classes = set()
+
+    for selector in content_classes:
+        match = SIMPLE_SELECTOR_RE.match(selector)
+        if not match:
+            return None
+        kind, value = match.groups()
+        if kind == '.':
+            classes.add(value)
+        elif kind == '#':
+            ids.add(value)
+        else:
+            names.add(value)
+
+    def keep(name, attrs):
+        if name in names or attrs.get('id') in ids:
+            return True
+        tag_classes = attrs.get('class') or ''
+        if isinstance(tag_classes, str):
+            tag_classes = tag_classes.split()
+        return not classes.isdisjoint(tag_classes)
+
+    return SoupStrainer(keep)
+
+
+def select_first(soup, selector: str) -> Optional[element.Tag]:
+    """
+    Return the first element that matches a CSS selector.
+
+    Selectors that are a single class, ID, or tag name go through find(),
+    which is much faster than matching the selector with soupsieve.
+    """
+    match = SIMPLE_SELECTOR_RE.match(selector)
+    if not match:
+        return soup.select_one(selector)
+    kind, value = match.groups()
+    if kind == '.':
+        return soup.find(class_=value)
+    if kind == '#':
+        return soup.find(id=value)
+    return soup.find(value)
+
+
+def prefixed_patterns(url: str, allow: Sequence[Pattern]) -> Tuple[Pattern, ...]:
+    """
+    Limit a site's `allow` patterns to URLs that start with the site's URL.
+
+    LinkExtractor follows a link if it matches any one of the `allow`
+    patterns, so we fold the URL prefix into each pattern. A lookahead
+    keeps each pattern's original "match anywhere in the URL" behavior.
+    """
+    prefix = re.escape(url)
+    if not allow:
+        return (re.compile(f"^{prefix}"), )
+    return tuple(
+        re.compile(f"^(?=.*?(?:{getattr(pattern, 'pattern', pattern)})){prefix}",
+                   getattr(pattern, 'flags', 0)) for pattern in allow)
 
 
 def get_section(root_url: str, url: str) -> str:
@@ -109,10 +223,11 @@ class DocumentParser:
         self.root_url = site_config.url
         self.validators = site_config.validators
         self.content_classes = site_config.content_classes
+        self.strainer = content_strainer(site_config.content_classes)
         self.escaper = TokenEscaper(site_config.literal_terms)
 
     def prepare_text(self, text: str, strip_symbols: bool = False) -> str:
-        base = text.strip().strip("\n").replace("\n", " ")
+        base = text.translate(WHITESPACE_TO_SPACES).strip()
         if strip_symbols:
             base = base.replace("#", " ")
         return self.escaper.escape(base)
@@ -124,29 +239,22 @@ class DocumentParser:
 
         Given a list of H2 elements in a page, we extract the HTML content for
         that "part" of the page by grabbing all of the sibling elements and
-        converting them to text.
+        converting them to text. The elements are already parsed, so we
+        read their text directly (see `section_texts()`) rather than
+        parsing their HTML again.
         """
         docs = []
+        texts = section_texts(h2s)
 
-        for i, tag in enumerate(h2s):
-            origin = tag
-
+        for i, (tag, text) in enumerate(zip(h2s, texts)):
             # Sometimes we stick the title in as a link...
             if tag and tag.string is None:
                 tag = tag.find("a")
 
             part_title = tag.get_text() if tag else ""
 
-            page = []
-            elem = next_element(origin)
-
-            while elem and elem.name != 'h2':
-                page.append(str(elem))
-                elem = next_element(elem)
-
             part_title = self.prepare_text(part_title)
-            body = self.prepare_text(
-                BeautifulSoup('\n'.join(page), 'html.parser').get_text())
+            body = self.prepare_text(text)
 
             doc_id = section_id(doc.url, i, body, doc.title, part_title)
 
@@ -163,6 +271,19 @@ class DocumentParser:
 
         return docs
 
+    def find_content(self, soup) -> Optional[element.Tag]:
+        """
+        Find the main content of a page.
+
+        We use the first content class we find on the page, in the order
+        the site configuration lists them.
+        """
+        for content_class in self.content_classes or ():
+            main_content = select_first(soup, content_class)
+            if main_content is not None:
+                return main_content
+        return None
+
     def prepare_document(self, url: str, html: str) -> List[SearchDocument]:
         """
         Break an HTML string up into a list of SearchDocuments.
@@ -172,24 +293,24 @@ class DocumentParser:
         that we index with the entire content of the page.
         """
         docs = []
-        soup = BeautifulSoup(html, 'html.parser')
-        content = soup
+        content = None
         safe_url = url.split('?')[0].rstrip('/')
 
+        # Parse only the title and main content when we can. Pages without
+        # any main content fall back to a full parse, and we index the
+        # entire page.
+        if self.strainer:
+            soup = BeautifulSoup(html, 'lxml', parse_only=self.strainer)
+            content = self.find_content(soup)
+        if content is None:
+            soup = BeautifulSoup(html, 'lxml')
+            content = self.find_content(soup) or soup
+
         try:
             title = self.prepare_text(soup.title.string.split("|")[0], True)
         except AttributeError as e:
             raise ParseError("Failed -- missing title") from e
 
-        # Use the first content class we find on the page. (i.e., main
-        # page content).
-        if self.content_classes:
-            for content_class in self.content_classes:
-                main_content = soup.select(content_class)
-                if main_content:
-                    content = main_content[0]
-                    break
-
         s = get_section(self.root_url, url)
         h2s = content.find_all('h2')
 
@@ -250,7 +371,12 @@ class DocumentationSpiderBase(scrapy.Spider):
     If `site_config.allow` or `site_config.deny` are defined, this
     scraper will send them in as arguments to LinkExtractor when
     extracting links on a page, allowing fine-grained control of URL
-    patterns to exclude or allow.
+    patterns to exclude or allow. Likewise, LinkExtractor drops links
+    outside of `site_config.allowed_domains` and links that don't start
+    with the site's URL.
+
+    The LinkExtractor compiles these patterns when we create it, so we
+    create it once per spider and reuse it for every page.
     """
     name: str = "documentation"
     doc_parser_class = DocumentParser
@@ -263,15 +389,14 @@ class DocumentationSpiderBase(scrapy.Spider):
         self.url = self.site_config.url
         self.doc_parser = self.doc_parser_class(self.site_config)
         super().__init__(*args, **kwargs)
-        self.extractor = LinkExtractor(allow=self.site_config.allow,
-                                       deny=self.site_config.deny)
+        self.extractor = LinkExtractor(
+            allow=prefixed_patterns(self.url, self.site_config.allow),
+            deny=self.site_config.deny,
+            allow_domains=self.site_config.allowed_domains)
 
     def follow_links(self, response):
         try:
-            links = [
-                l for l in self.extractor.extract_links(response)
-                if l.url.startswith(self.url)
-            ]
+            links = self.extractor.extract_links(response)
         except AttributeError:  # Usually means this page isn't text -- could be a a PDF, etc.
             links = []
         yield from response.follow_all(links, callback=self.parse)
@@ -341,6 +466,10 @@ class Indexer:
         # segment of its URL to known URLs.
         self.seen_urls: Dict[str, str] = {}
 
+        # The hierarchy we built for each URL. A page and all of its
+        # sections share a URL, and thus a hierarchy.
+        self.hierarchies: Dict[str, List[str]] = {}
+
         # This is the set of all known document IDs. We'll use this to remove
         # outdated documents from the index.
         self.seen_ids: Set[str] = set()
@@ -363,11 +492,22 @@ class Indexer:
         score = 1.0
         for scorer in self.site.scorers:
             score = scorer(document, score)
-        doc = asdict(document)
-        doc['__score'] = score
-        hierarchy = self.build_hierarchy(document)
-        doc['hierarchy'] = json.dumps(hierarchy)
-        return doc
+        # We build this dictionary by hand rather than with asdict(), which
+        # deep-copies every field -- including the hierarchy list that we
+        # replace with its JSON anyway.
+        return {
+            'doc_id': document.doc_id,
+            'title': document.title,
+            'section_title': document.section_title,
+            'hierarchy': ujson.dumps(self.build_hierarchy(document),
+                                     escape_forward_slashes=False),
+            'url': document.url,
+            'body': document.body,
+            'type': document.type,
+            's': document.s,
+            'position': document.position,
+            '__score': score,
+        }
 
     def index_document(self, doc: SearchDocument):
         """
@@ -387,12 +527,46 @@ class Indexer:
         new_urls_key = self.keys.site_urls_new(self.index_alias)
         self.redis.sadd(new_urls_key, doc.url)
 
+    def index_documents(self, docs: List[SearchDocument]):
+        """
+        Add a batch of documents to the search index.
+
+        The writes for the whole batch go out in a single pipeline, so
+        the batch pays one round trip to Redis instead of one per
+        document. If Redis rejects the batch as a whole because of bad
+        data, we fall back to indexing its documents one at a time so
+        that a single bad document doesn't cost us the entire batch.
+        """
+        new_urls_key = self.keys.site_urls_new(self.index_alias)
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for doc in docs:
+            key = self.keys.document(self.site.url, doc.doc_id)
+            pipeline.hset(key, mapping=self.document_to_dict(doc))
+            pipeline.sadd(new_urls_key, doc.url)
+
+        try:
+            results = pipeline.execute(raise_on_error=False)
+        except redis.exceptions.DataError as e:
+            log.error("Failed -- bad data in batch, retrying singly: %s", e)
+            for doc in docs:
+                self.index_document(doc)
+            return
+
+        # Every document queued two commands: HSET, then SADD.
+        for doc, result in zip(docs, results[::2]):
+            if isinstance(result, redis.exceptions.ResponseError):
+                log.error("Failed -- response error: %s, %s", result, doc.url)
+
     def add_synonyms(self):
+        """Add every synonym group to the index in one round trip."""
+        pipeline = self.redis.pipeline(transaction=False)
         for synonym_group in self.site.synonym_groups:
-            return self.redis.execute_command(SYNUPDATE_COMMAND,
-                                              self.index_name,
-                                              synonym_group.group_id,
-                                              *synonym_group.synonyms)
+            pipeline.execute_command(SYNUPDATE_COMMAND,
+                                     self.index_name,
+                                     synonym_group.group_id,
+                                     *synonym_group.synonyms)
+        return pipeline.execute()
 
     def search_index_exists(self):
         try:
@@ -516,14 +690,20 @@ class Indexer:
         of URLs with and without trailing slashes, we always remove the
         trailing slash when we add a URL to `seen_urls` and then we remove
         any trailing slashes again when we look up a URL.
+
+        A page and its sections share a URL, so we build the hierarchy
+        once per URL and reuse it for the rest of the URL's documents.
         """
+        hierarchy = self.hierarchies.get(doc.url)
+        if hierarchy is not None:
+            return hierarchy
+
         hierarchy = []
         url = doc.url.replace(self.site.url, "").replace("//", "/").strip("/")
-        parts = url.split("/")
-        joinable_site_url = self.site.url.rstrip("/")
+        path_url = self.site.url.rstrip("/")
 
-        for i, part in enumerate(parts):
-            path_url = "/".join([joinable_site_url, *parts[:i], part])
+        for part in url.split("/"):
+            path_url = f"{path_url}/{part}"
             page = self.seen_urls.get(path_url)
             if page:
                 hierarchy.append(page)
@@ -531,6 +711,7 @@ class Indexer:
         if not hierarchy:
             log.debug('URL lacks hierarchy: %s', url)
 
+        self.hierarchies[doc.url] = hierarchy
         return hierarchy
 
     def index(self, force: bool = False):
@@ -549,7 +730,9 @@ class Indexer:
 
         log.info("[Starting] indexing for site %s", self.site.url)
 
-        docs_to_process = Queue()
+        # Documents we scraped, grouped into batches of BATCH_SIZE that we
+        # write to Redis in one pipeline each once the crawl is done.
+        batches: List[List[SearchDocument]] = [[]]
         Spider = type(
             'Spider', (DocumentationSpiderBase, ), {"site_config": self.site})
 
@@ -565,29 +748,26 @@ class Indexer:
             # within the hierarchy JSON because json.loads() can't parse them...
             self.seen_urls[url_without_slash] = item.title.replace("//", "")
             self.seen_ids |= {item.doc_id}
-            docs_to_process.put(item)
-
-        def index_documents():
-            while True:
-                doc: SearchDocument = docs_to_process.get()
-                try:
-                    self.index_document(doc)
-                except Exception as e:
-                    log.error(
-                        "Unexpected error while indexing doc %s, error: %s",
-                        doc.doc_id, e)
-                docs_to_process.task_done()
+            if len(batches[-1]) >= BATCH_SIZE:
+                batches.append([])
+            batches[-1].append(item)
 
         def start_indexing():
-            if docs_to_process.empty():
+            if not batches[0]:
                 # Don't keep around an empty search index.
                 self.redis.execute_command('FT.DROPINDEX', self.index_name)
                 return
-            for _ in range(MAX_THREADS):
-                Thread(target=index_documents, daemon=True).start()
             self.redis.set(self.keys.last_index(self.site.url),
                            datetime.datetime.now().timestamp())
-            docs_to_process.join()
+            # We can only build a document's hierarchy after we've seen
+            # every URL on the site, so indexing waits for the crawl to end.
+            for batch in batches:
+                try:
+                    self.index_documents(batch)
+                except Exception as e:
+                    log.error(
+                        "Unexpected error while indexing batch of %s docs, error: %s",
+                        len(batch), e)
             self.create_index_alias()
             self.clear_old_hashes()
             self.redis.delete(self.lock)
@@ -1,6 +1,7 @@
 import re
 from dataclasses import dataclass, replace
-from typing import Dict, List, Set, Tuple, Callable, Pattern
+from functools import cached_property
+from typing import Dict, FrozenSet, List, Set, Tuple, Callable, Pattern
 
 from redisearch.client import Field
 
@@ -45,12 +46,12 @@ class SiteConfiguration:
     content_classes: Tuple[str, ...] = None
     literal_terms: Tuple[str, ...] = ""
 
-    @property
-    def all_synonyms(self) -> Set[str]:
+    @cached_property
+    def all_synonyms(self) -> FrozenSet[str]:
         synonyms = set()
         for syn_group in self.synonym_groups:
             synonyms |= syn_group.synonyms
-        return synonyms
+        return frozenset(synonyms)
 
     def landing_page(self, query) -> SearchDocument:
         page = self.landing_pages.get(query, None)
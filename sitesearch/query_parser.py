@@ -1,9 +1,19 @@
 import re
-from typing import List, Optional, Sequence
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Sequence, Tuple
 
 from sitesearch.models import SiteConfiguration
 
-UNSAFE_CHARS = re.compile(r'[\[\]<>+]')
+# Characters that confuse the RediSearch query parser. We replace each of
+# these with a space in one pass with str.translate(). Braces would let a
+# query inject its own attributes, like the {$weight: 10} we add for
+# section boosts.
+UNSAFE_CHARS = str.maketrans({char: ' ' for char in '[]{}<>+'})
+
+# The FT.SEARCH options that follow every query, up to the LIMIT values.
+SEARCH_OPTIONS = ("SUMMARIZE", "FIELDS", "1", "body", "FRAGS", "1", "LEN", "10",
+                  "HIGHLIGHT", "FIELDS", "3", "title", "body", "section_title",
+                  "LIMIT")
 
 
 class TokenEscaper:
@@ -37,14 +47,41 @@ class TokenEscaper:
         return self.literal_terms_re.sub(escape_string, string)
 
 
-async def parse(index_alias: str, query: str, section: Optional[str], start: int, num: int,
-                search_site: SiteConfiguration) -> List[str]:
+@lru_cache(maxsize=None)
+def get_escaper(literal_terms: Tuple[str, ...]) -> TokenEscaper:
+    """
+    Return a shared TokenEscaper for a site's literal terms.
+
+    Compiling the literal-terms regex is the most expensive part of
+    parsing a query, and a site's terms never change, so we compile it
+    once per set of terms instead of once per query.
+    """
+    return TokenEscaper(literal_terms)
 
+
+# How many distinct (query, section) pairs to remember.
+QUERY_CACHE_SIZE = 4096
+
+# Queries and sections come straight from the search API, so we only cache
+# short ones. Otherwise a client sending distinct long queries could pin
+# QUERY_CACHE_SIZE large strings in memory.
+MAX_CACHED_QUERY_LENGTH = 256
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def build_query(query: str, section: Optional[str], literal_terms: Tuple[str, ...],
+                synonyms: FrozenSet[str]) -> str:
+    """
+    Turn a user's query into a RediSearch query string.
+
+    The result depends only on the arguments, so we cache it: popular
+    queries, and the same query paged through, skip the string work.
+    """
     # Dash postfixes confuse the query parser.
     query = query.strip().replace("-*", "*")
-    query = UNSAFE_CHARS.sub(' ', query)
+    query = query.translate(UNSAFE_CHARS)
     query = query.strip()
-    query = TokenEscaper(search_site.literal_terms).escape(query)
+    query = get_escaper(literal_terms).escape(query)
 
     # For queries of a term that should result in an exact match, e.g.
     # "insight" (a synonym of RedisInsight), or "active-active", strip any star
@@ -54,13 +91,32 @@ async def parse(index_alias: str, query: str, section: Optional[str], start: int
     #  queries with escaped tokens?
     if query.endswith('*'):
         exact_match_query = query.rstrip("*")
-        if exact_match_query in search_site.all_synonyms:
+        if exact_match_query in synonyms:
             query = exact_match_query
 
     if query and section:
         # Boost results in the section the user is currently browsing.
         query = f"((@s:{section}) => {{$weight: 10}} {query}) | {query}"
 
-    options = f'SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT {start} {num}'.split(' ')
+    return query
+
+
+def parse_sync(index_alias: str, query: str, section: Optional[str], start: int, num: int,
+               search_site: SiteConfiguration) -> List[str]:
+    """
+    Build the arguments for an FT.SEARCH command from a user's query.
+
+    This is pure string work, so callers that aren't running in an event
+    loop can use it directly; `parse()` wraps it for async callers.
+    """
+    if len(query) > MAX_CACHED_QUERY_LENGTH or (section and len(section) > MAX_CACHED_QUERY_LENGTH):
+        build = build_query.__wrapped__
+    else:
+        build = build_query
+    query = build(query, section, search_site.literal_terms, search_site.all_synonyms)
+    return [index_alias, query, *SEARCH_OPTIONS, str(start), str(num)]
+
 
-    return [index_alias, query] + options
+async def parse(index_alias: str, query: str, section: Optional[str], start: int, num: int,
+                search_site: SiteConfiguration) -> List[str]:
+    return parse_sync(index_alias, query, section, start, num, search_site)
@@ -223,7 +223,7 @@ CORPORATE = SiteConfiguration(
     url="https://redislabs.com",
     synonym_groups=SYNONYMS,
     landing_pages=LANDING_PAGES,
-    allowed_domains=('redis.com',),
+    allowed_domains=('redislabs.com',),
     search_schema=(
         TextField("title", weight=10),
         TextField("section_title"),
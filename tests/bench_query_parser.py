@@ -0,0 +1,21 @@
+"""
+Benchmarks for the query parser.
+
+These don't run with the rest of the suite. Run them explicitly with:
+
+    pytest tests/bench_query_parser.py
+
+And compare against a saved run with --benchmark-autosave and
+--benchmark-compare.
+"""
+from sitesearch.query_parser import build_query, parse_sync
+
+
+def test_parse_sync(benchmark, config):
+    benchmark(parse_sync, "index", "python-*", None, 0, 10, config.default_search_site)
+
+
+def test_build_query_uncached(benchmark, config):
+    site = config.default_search_site
+    benchmark(build_query.__wrapped__, "active-active setup", "test",
+              site.literal_terms, site.all_synonyms)
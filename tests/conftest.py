@@ -3,6 +3,7 @@ import asyncio
 
 import pytest
 import aioredis
+import uvloop
 from httpx import AsyncClient
 from sitesearch.api.app import create_app
 from sitesearch.config import AppConfiguration
@@ -16,6 +17,9 @@ FILE_WITH_SECTIONS = "page_with_sections.html"
 TEST_DOC = os.path.join(DOCS_DIR, FILE_WITH_SECTIONS)
 TEST_URL = f"{OLD_DOCS_PROD.url}/test"
 
+# Uvicorn runs the app on uvloop, so we test on it too.
+asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 
 @pytest.fixture(autouse=True)
 def redis():
@@ -27,6 +31,12 @@ def app_config():
     yield AppConfiguration(key_prefix="sitesearch:test", env="test")
 
 
+@pytest.fixture(scope="session")
+def config():
+    """A default AppConfiguration for tests that only read from it."""
+    return AppConfiguration()
+
+
 @pytest.fixture(scope="function")
 async def client(app_config):
     async with AsyncClient(app=create_app(app_config), base_url="http://test") as ac:
@@ -82,7 +92,7 @@ async def delete_test_keys(request, app_config):
 
 @pytest.fixture(scope="session")
 def event_loop(request):
-    """Create an instance of the default event loop for each test case."""
+    """Create one event loop (a uvloop loop) shared by the whole test session."""
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
@@ -1,13 +1,18 @@
 import os
+import re
+from dataclasses import fields, replace
 from unittest import mock
 from unittest.mock import call
 
 import pytest
+from scrapy.utils.url import url_is_from_any_domain
 
 from sitesearch.keys import Keys
-from sitesearch.sites.redis_labs import OLD_DOCS_PROD
+from sitesearch.sites.andrewbrookins import BLOG
+from sitesearch.sites.redis_labs import CORPORATE, DEVELOPERS, DOCS_PROD, OLD_DOCS_PROD, OSS
 from sitesearch.errors import ParseError
-from sitesearch.indexer import DocumentParser, Indexer, md5, SECTION_ID, PAGE_ID, page_id, section_id
+from sitesearch.indexer import DocumentParser, Indexer, md5, SECTION_ID, PAGE_ID, page_id, section_id, \
+    prefixed_patterns
 from sitesearch.models import SearchDocument
 
 DOCS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
@@ -115,38 +120,38 @@ def test_indexer_indexes_page_section_documents(index_file, keys, site):
     """
     indexer = index_file(FILE_WITH_SECTIONS)
     expected_section_docs = [{
-        'doc_id': f'{TEST_URL}:section:2e1ea4c2dfa16d70a0254f4b00520687',
+        'doc_id': f'{TEST_URL}:section:95f9688f19d3d28abb5def187afb512c',
         'title': 'Database Persistence with Redis Enterprise Software',
         'section_title': 'Options for configuring data persistence',
         'hierarchy': '[]',
         'url': TEST_URL,
         's': 'test',
         'body':
-        'There are six\xa0options for persistence in Redis Enterprise Software:    Options Description     None Data is not persisted to disk at all.   Append Only File (AoF) on every write Data is fsynced to disk with every write.   Append Only File (AoF) one second Data is fsynced to disk every second.   Snapshot every 1 hour A snapshot of the database is created every hour.   Snapshot every 6 hours A snapshot of the database is created every 6 hours.   Snapshot every 12 hours A snapshot of the database is created every 12 hours.    The first thing you need to do is determine if you even need persistence. Persistence is used to recover from a catastrophic failure, so make sure that you need to incur the overhead of persistence before you select it. If the database is being used as a cache, then you may not need persistence. If you do need persistence, then you need to identify\xa0which is the best type for your use case.',
+        'There are six\xa0options for persistence in Redis Enterprise Software:      Options Description     None Data is not persisted to disk at all.   Append Only File (AoF) on every write Data is fsynced to disk with every write.   Append Only File (AoF) one second Data is fsynced to disk every second.   Snapshot every 1 hour A snapshot of the database is created every hour.   Snapshot every 6 hours A snapshot of the database is created every 6 hours.   Snapshot every 12 hours A snapshot of the database is created every 12 hours.      The first thing you need to do is determine if you even need persistence. Persistence is used to recover from a catastrophic failure, so make sure that you need to incur the overhead of persistence before you select it. If the database is being used as a cache, then you may not need persistence. If you do need persistence, then you need to identify\xa0which is the best type for your use case.',
         'type': 'section',
         'position': 0,
         '__score': 0.75,
     }, {
-        'doc_id': f'{TEST_URL}:section:68139f8fbbf3f37c1c1a2c0f94ad90f1',
+        'doc_id': f'{TEST_URL}:section:e19b9c91e89a4a7e1eff4b8164fbd5c5',
         'title': 'Database Persistence with Redis Enterprise Software',
         'section_title': 'Append only file (AOF) vs snapshot (RDB)',
         'hierarchy': '[]',
         'url': TEST_URL,
         's': 'test',
         'body':
-        'Now that you know the available options, to assist in making a decision on which option is right for your use case, here is a table about the two:    Append Only File (AOF) Snapshot (RDB)     More resource intensive Less resource\xa0intensive   Provides better durability (recover the latest point in time) Less durable   Slower time to recover (Larger files) Faster recovery time   More disk space required (files tend to grow large and require compaction) Requires less resource (I/O once every several hours and no compaction required)',
+        'Now that you know the available options, to assist in making a decision on which option is right for your use case, here is a table about the two:      Append Only File (AOF) Snapshot (RDB)     More resource intensive Less resource\xa0intensive   Provides better durability (recover the latest point in time) Less durable   Slower time to recover (Larger files) Faster recovery time   More disk space required (files tend to grow large and require compaction) Requires less resource (I/O once every several hours and no compaction required)',
         'type': 'section',
         'position': 1,
         '__score': 0.75,
     }, {
-        'doc_id': f'{TEST_URL}:section:9cc345ed21dec166694ef55243858189',
+        'doc_id': f'{TEST_URL}:section:84e6a62b07c387e2e45fd19bba1d659a',
         'title': 'Database Persistence with Redis Enterprise Software',
         'section_title': 'Data persistence and Redis on Flash with Active\\-Active',
         's': 'test',
         'hierarchy': '[]',
         'url': TEST_URL,
         'body':
-        "active\-active If you are enabling data persistence for databases running on Redis Enterprise Flash, by default both master and slave shards are configured to write to disk. This is unlike a standard Redis Enterprise Software database where only the slave shards persist to disk. This master and slave dual data persistence with replication is done to better protect the database against node failures. Flash-based databases are expected to hold larger datasets and repair times for shards can be longer under node failures. Having dual-persistence provides better protection against failures under these longer repair times. However, the dual data persistence with replication adds some processor and network overhead, especially in the case of cloud configurations with persistent storage that is network attached (e.g. EBS-backed volumes in AWS). The redis version is v6\.2\.8 Another redis version is v6\.2\.4 3rd Redis version test: the version is v6\.0\.20 4th Redis version test: the version is v6\.0\.12 5th Redis version test: the version is v6\.0\.8 6th Redis version test: the version is v6\.0 7th Redis version test: the version is v5\.6\.0 8th Redis version test: the version is v5\.4\.14 9th Redis version test: the version is v5\.4\.10 10th Redis version test: the version is v5\.4\.6 11th Redis version test: the version is v5\.4\.4 12th Redis version test: the version is v5\.4\.2 13th Redis version test: the version is v5\.4 There may be times where performance is critical for your use case and you don’t want to risk data persistence adding latency. If that is the case, you can disable data-persistence on the master shards using the following rladmin command: rladmin tune db db: master_persistence disabled",
+        'active\\-active   If you are enabling data persistence for databases running on Redis Enterprise Flash, by default both master and slave shards are configured to write to disk. This is unlike a standard Redis Enterprise Software database where only the slave shards persist to disk. This master and slave dual data persistence with replication is done to better protect the database against node failures. Flash-based databases are expected to hold larger datasets and repair times for shards can be longer under node failures. Having dual-persistence provides better protection against failures under these longer repair times.   However, the dual data persistence with replication adds some processor and network overhead, especially in the case of cloud configurations with persistent storage that is network attached (e.g. EBS-backed volumes in AWS).   The redis version is v6\\.2\\.8   Another redis version is v6\\.2\\.4   3rd Redis version test: the version is v6\\.0\\.20   4th Redis version test: the version is v6\\.0\\.12   5th Redis version test: the version is v6\\.0\\.8   6th Redis version test: the version is v6\\.0   7th Redis version test: the version is v5\\.6\\.0   8th Redis version test: the version is v5\\.4\\.14   9th Redis version test: the version is v5\\.4\\.10   10th Redis version test: the version is v5\\.4\\.6   11th Redis version test: the version is v5\\.4\\.4   12th Redis version test: the version is v5\\.4\\.2   13th Redis version test: the version is v5\\.4   There may be times where performance is critical for your use case and you don’t want to risk data persistence adding latency. If that is the case, you can disable data-persistence on the master shards using the following\xa0rladmin command:   rladmin tune db db: master_persistence disabled',
         'type': 'section',
         'position': 2,
         '__score': 0.75
@@ -168,6 +173,36 @@ def test_indexer_indexes_page_section_documents(index_file, keys, site):
         assert doc == call[1]['mapping']
 
 
+def test_indexer_indexes_batches_in_one_pipeline(indexer, parse_file, keys, site):
+    docs = parse_file(FILE_WITH_SECTIONS)
+    indexer.index_documents(docs)
+
+    redis_client = indexer.search_client.redis
+    pipeline = redis_client.pipeline.return_value
+    redis_client.pipeline.assert_called_once_with(transaction=False)
+    pipeline.execute.assert_called_once_with(raise_on_error=False)
+    redis_client.hset.assert_not_called()
+
+    keys_written = [c[0][0] for c in pipeline.hset.call_args_list]
+    assert keys_written == [keys.document(site.url, doc.doc_id) for doc in docs]
+
+
+def test_document_to_dict_includes_every_document_field(indexer, parse_file):
+    doc = parse_file(FILE_WITH_SECTIONS)[0]
+    expected_fields = {field.name for field in fields(SearchDocument)}
+
+    assert set(indexer.document_to_dict(doc)) == expected_fields | {'__score'}
+
+
+def test_indexer_adds_every_synonym_group(indexer, site):
+    indexer.add_synonyms()
+
+    pipeline = indexer.search_client.redis.pipeline.return_value
+    group_ids = [c[0][2] for c in pipeline.execute_command.call_args_list]
+    assert group_ids == [g.group_id for g in site.synonym_groups]
+    pipeline.execute.assert_called_once_with()
+
+
 def test_document_parser_skips_pages_without_title(parse_file):
     with pytest.raises(ParseError):
         parse_file(FILE_WITHOUT_TITLE)
@@ -185,6 +220,29 @@ def test_parsing_page_with_links_in_h2s_returns_body_content(parse_file):
         assert doc.body is not None
 
 
+def test_prefixed_patterns_require_site_url_prefix():
+    site_url = "https://docs.redislabs.com/latest"
+    patterns = prefixed_patterns(site_url, (re.compile("/rs/"), ))
+
+    def allowed(url):
+        return any(p.search(url) for p in patterns)
+
+    assert allowed(f"{site_url}/rs/databases")
+    assert not allowed(f"{site_url}/rc/databases")
+    assert not allowed("https://docs.redislabs.com/6.0/rs/databases")
+
+    patterns = prefixed_patterns(site_url, ())
+    assert allowed(f"{site_url}/rc/databases")
+    assert not allowed("https://docs.redislabs.com/6.0/rc/databases")
+
+
+@pytest.mark.parametrize("site", [DOCS_PROD, OLD_DOCS_PROD, DEVELOPERS, CORPORATE, OSS, BLOG])
+def test_site_url_is_in_allowed_domains(site):
+    # The spider's LinkExtractor drops links outside of allowed_domains,
+    # so a site whose URL isn't in them would never be crawled.
+    assert url_is_from_any_domain(site.url, site.allowed_domains)
+
+
 def test_build_hierarchy(indexer):
     indexer.seen_urls = {
         "https://docs.redislabs.com/latest/1": "One",
@@ -203,51 +261,73 @@ def test_build_hierarchy(indexer):
     assert indexer.build_hierarchy(doc) == ['One', 'Two', 'Three']
 
 
+def test_build_hierarchy_reuses_hierarchy_for_url(indexer):
+    indexer.seen_urls = {
+        "https://docs.redislabs.com/latest/1": "One",
+        "https://docs.redislabs.com/latest/1/2": "Two",
+    }
+    page = SearchDocument(doc_id="123",
+                          title="Title",
+                          section_title="",
+                          hierarchy=[],
+                          s="",
+                          url="https://docs.redislabs.com/latest/1/2",
+                          body="This is the body",
+                          type='page',
+                          position=0)
+    section = replace(page, doc_id="456", section_title="Section", type='section')
+
+    hierarchy = indexer.build_hierarchy(page)
+
+    assert hierarchy == ['One', 'Two']
+    assert indexer.build_hierarchy(section) is hierarchy
+
+
 def test_indexer_indexes_sections_from_h3s(index_file, keys, site):
     indexer = index_file(FILE_WITH_H3s)
 
     expected_section_docs = [{
-        'doc_id':  f'{TEST_URL}:section:b865fa879111e330b736d9be3e196048',
+        'doc_id':  f'{TEST_URL}:section:17767c18cdeae655bc0dedd3364d099c',
         'title': 'RedisBloom Tutorial',
         'section_title': '',
         'hierarchy': '[]',
         'url': 'https://docs.redislabs.com/latest//test',
-        'body': """Follow                                                  this link to register                                                  and subscribe to Redis Enterprise Cloud                                                                                                   Step 2. Create a database with RedisBloom Module                                                 #                                                       Step 3. Connect to a database                                                 #                                                   Follow                                                  this                                                  link to know how to connect to a database                                                                                                Step 4. Getting Started with RedisBloom                                                 #  In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.  Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:  Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists  Let’s walk through the process step-by-step:                                                   Create a Bloom filter                                                 #  Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:      >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                     Determine whether or not an item exists                                                 #  Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:      >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy        >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy   In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                   Add one or more items to the Bloom filter                                                 #  Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:      >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy   As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                   Determine whether or not a unique visitor’s IP address exists                                                 #  Use BF.MEXISTS to determine if one or more items may exist in the filter or not:      >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy         >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy   In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                   Next Step                                                 #                                                        Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.""",
+        'body': 'Follow                                                  this link to register                                                  and subscribe to Redis Enterprise Cloud                                                                                                       Step 2. Create a database with RedisBloom Module                                                 #                                                           Step 3. Connect to a database                                                 #                                                     Follow                                                  this                                                  link to know how to connect to a database                                                                                                  Step 4. Getting Started with RedisBloom                                                 #    In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.    Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:    Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists    Let’s walk through the process step-by-step:                                                     Create a Bloom filter                                                 #    Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:        >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                       Determine whether or not an item exists                                                 #    Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:        >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy          >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy     In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                     Add one or more items to the Bloom filter                                                 #    Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:        >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy     As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                     Determine whether or not a unique visitor’s IP address exists                                                 #    Use BF.MEXISTS to determine if one or more items may exist in the filter or not:        >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy           >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy     In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                     Next Step                                                 #                                                          Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
         'type': 'section',
         's': 'test',
         'position': 0,
         '__score': 0.75
     }, {
-        'doc_id': f'{TEST_URL}:section:23d7ae247e11c7851ce08896040e0922',
+        'doc_id': f'{TEST_URL}:section:b4006a23eeb6a8d768669d9f343ff241',
         'title': 'RedisBloom Tutorial',
         'section_title': '',
         'hierarchy': '[]',
         'url': 'https://docs.redislabs.com/latest//test',
-        'body': 'Step 3. Connect to a database                                                 #                                                   Follow                                                  this                                                  link to know how to connect to a database                                                                                                Step 4. Getting Started with RedisBloom                                                 #  In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.  Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:  Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists  Let’s walk through the process step-by-step:                                                   Create a Bloom filter                                                 #  Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:      >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                     Determine whether or not an item exists                                                 #  Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:      >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy        >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy   In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                   Add one or more items to the Bloom filter                                                 #  Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:      >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy   As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                   Determine whether or not a unique visitor’s IP address exists                                                 #  Use BF.MEXISTS to determine if one or more items may exist in the filter or not:      >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy         >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy   In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                   Next Step                                                 #                                                        Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
+        'body': 'Step 3. Connect to a database                                                 #                                                     Follow                                                  this                                                  link to know how to connect to a database                                                                                                  Step 4. Getting Started with RedisBloom                                                 #    In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.    Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:    Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists    Let’s walk through the process step-by-step:                                                     Create a Bloom filter                                                 #    Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:        >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                       Determine whether or not an item exists                                                 #    Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:        >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy          >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy     In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                     Add one or more items to the Bloom filter                                                 #    Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:        >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy     As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                     Determine whether or not a unique visitor’s IP address exists                                                 #    Use BF.MEXISTS to determine if one or more items may exist in the filter or not:        >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy           >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy     In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                     Next Step                                                 #                                                          Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
         'type': 'section',
         's': 'test',
         'position': 1,
         '__score': 0.75
     }, {
-        'doc_id': f'{TEST_URL}:section:1d42fac7043abe3c7e7debbb7dd14983',
+        'doc_id': f'{TEST_URL}:section:d3d39cfd4eb039c49bbad80430276d88',
         'title': 'RedisBloom Tutorial',
         'section_title': '',
         'hierarchy': '[]',
         'url': 'https://docs.redislabs.com/latest//test',
         'body':
-        'Follow                                                  this                                                  link to know how to connect to a database                                                                                                Step 4. Getting Started with RedisBloom                                                 #  In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.  Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:  Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists  Let’s walk through the process step-by-step:                                                   Create a Bloom filter                                                 #  Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:      >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                     Determine whether or not an item exists                                                 #  Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:      >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy        >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy   In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                   Add one or more items to the Bloom filter                                                 #  Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:      >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy   As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                   Determine whether or not a unique visitor’s IP address exists                                                 #  Use BF.MEXISTS to determine if one or more items may exist in the filter or not:      >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy         >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy   In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                   Next Step                                                 #                                                        Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
+        'Follow                                                  this                                                  link to know how to connect to a database                                                                                                  Step 4. Getting Started with RedisBloom                                                 #    In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.    Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:    Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists    Let’s walk through the process step-by-step:                                                     Create a Bloom filter                                                 #    Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:        >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                       Determine whether or not an item exists                                                 #    Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:        >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy          >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy     In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                     Add one or more items to the Bloom filter                                                 #    Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:        >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy     As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                     Determine whether or not a unique visitor’s IP address exists                                                 #    Use BF.MEXISTS to determine if one or more items may exist in the filter or not:        >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy           >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy     In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                     Next Step                                                 #                                                          Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
         'type': 'section',
         's': 'test',
         'position': 2,
         '__score': 0.75
     }, {
-        'doc_id': f'{TEST_URL}:section:b676e4c351aafb9e89e71a391e9c6209',
+        'doc_id': f'{TEST_URL}:section:cd5466992878d9c17a23c07a6208b555',
         'title': 'RedisBloom Tutorial',
         'section_title': '',
         'hierarchy': '[]',
         'url': 'https://docs.redislabs.com/latest//test',
         'body':
-        'In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.  Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:  Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists  Let’s walk through the process step-by-step:                                                   Create a Bloom filter                                                 #  Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:      >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                     Determine whether or not an item exists                                                 #  Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:      >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy        >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy   In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                   Add one or more items to the Bloom filter                                                 #  Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:      >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy   As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                   Determine whether or not a unique visitor’s IP address exists                                                 #  Use BF.MEXISTS to determine if one or more items may exist in the filter or not:      >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy         >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy   In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                   Next Step                                                 #                                                        Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
+        'In the next steps you will use some basic RedisBloom commands. You can run them from the Redis command-line interface (redis\\-cli) or use the CLI available in RedisInsight. (See part 2 of this tutorial to learn more about using the RedisInsight CLI.) To interact with RedisBloom, you use the BF.ADD and BF.EXISTS commands.    Let’s go ahead and test drive some RedisBloom-specific operations. We will create a basic dataset based on unique visitors’ IP addresses, and you will see how to:    Create a Bloom filter Determine whether or not an item exists in the Bloom filter Add one or more items to the Bloom filter Determine whether or not a unique visitor’s IP address exists    Let’s walk through the process step-by-step:                                                     Create a Bloom filter                                                 #    Use the BF.ADD command to add a unique visitor IP address to the Bloom filter as shown here:        >> BF.ADD unique_visitors 10.94.214.120   (integer) 1   (1.75s)    Copy                                                       Determine whether or not an item exists                                                 #    Use the BF.EXISTS command to determine whether or not an item may exist in the Bloom filter:        >> BF.EXISTS unique_visitors 10.94.214.120   (integer) 1    Copy          >> BF.EXISTS unique_visitors 10.94.214.121   (integer) 0   (1.46s)    Copy     In the above example, the first command shows the result as “1”, indicating that the item may exist, whereas the second command displays "0", indicating that the item certainly may not exist.                                                     Add one or more items to the Bloom filter                                                 #    Use the BF.MADD command to add one or more items to the Bloom filter, creating the filter if it does not yet exist. This command operates identically to BF.ADD, except it allows multiple inputs and returns multiple values:        >> BF.MADD unique_visitors 10.94.214.100 10.94.214.200 10.94.214.210 10.94.214.212   1) (integer) 1   2) (integer) 1   3) (integer) 1   4) (integer) 1    Copy     As shown above, the BF.MADD allows you to add one or more visitors’ IP addresses to the Bloom filter.                                                     Determine whether or not a unique visitor’s IP address exists                                                 #    Use BF.MEXISTS to determine if one or more items may exist in the filter or not:        >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.212   1) (integer) 1   2) (integer) 1    Copy           >> BF.MEXISTS unique_visitors 10.94.214.200 10.94.214.213   1) (integer) 1   2) (integer) 0    Copy     In the above example, the first command shows the result as “1” for both the visitors’ IP addresses, indicating that these items do exist. The second command displays "0" for one of the visitor’s IP addresses, indicating that the item certainly does not exist.                                                     Next Step                                                 #                                                          Learn more about RedisBloom in the                                                      Quick Start                                                      tutorial.',
         'type': 'section',
         's': 'test',
         'position': 3,
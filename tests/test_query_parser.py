@@ -1,57 +1,72 @@
 import pytest
 
-from sitesearch.config import AppConfiguration
-from sitesearch.query_parser import parse
+from sitesearch.query_parser import MAX_CACHED_QUERY_LENGTH, build_query, get_escaper, parse, parse_sync
 
-config = AppConfiguration()
+# The search options that follow the query in every parsed query.
+SUFFIX = ("SUMMARIZE", "FIELDS", "1", "body", "FRAGS", "1", "LEN", "10",
+          "HIGHLIGHT", "FIELDS", "3", "title", "body", "section_title",
+          "LIMIT", "0", "10")
 
+CASES = [
+    # Strips dash-star postfixes.
+    ("python-*", ["index", "python*", *SUFFIX]),
+    # Strips unsafe characters.
+    ("this is a [test]", ["index", "this is a  test", *SUFFIX]),
+    ("test {$weight: 10}", ["index", "test  $weight: 10", *SUFFIX]),
+    # Summarizes the body and highlights fields.
+    ("test", ["index", "test", *SUFFIX]),
+    # Exact search for synonym terms.
+    ("insight*", ["index", "insight", *SUFFIX]),
+    # Allows fuzzy search for non-synonym terms.
+    ("test*", ["index", "test*", *SUFFIX]),
+    # Escapes configured literal terms.
+    ("active-active", ["index", "active\\-active", *SUFFIX]),
+    ("leader-follower active-active", ["index", "leader\\-follower active\\-active", *SUFFIX]),
+]
 
-@pytest.mark.asyncio
-async def test_strips_dash_star_postfixes():
-    query = await parse("index", "python-*", None, 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index python* SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
 
+@pytest.mark.parametrize("query,expected", CASES)
+def test_parse(query, expected, config):
+    assert parse_sync("index", query, None, 0, 10, config.default_search_site) == expected
 
-@pytest.mark.asyncio
-async def test_strips_unsafe_chars():
-    query = await parse("index", "this is a [test]", None, 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index this is a  test SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
 
-
-@pytest.mark.asyncio
-async def test_summarizes_body():
-    query = await parse("index", "test", None, 0, 10, config.default_search_site)
-    assert "SUMMARIZE FIELDS 1 body" in " ".join(query)
+def test_boosts_current_section_if_given(config):
+    query = parse_sync("index", "test", "test", 0, 10, config.default_search_site)
+    assert query == ["index", "((@s:test) => {$weight: 10} test) | test", *SUFFIX]
 
 
 @pytest.mark.asyncio
-async def test_highlights_fields():
-    query = await parse("index", "test", None, 0, 10, config.default_search_site)
-    assert "HIGHLIGHT FIELDS 3 title body section_title" in " ".join(query)
+async def test_parse_matches_parse_sync(config):
+    query = await parse("index", "python-*", "test", 0, 10, config.default_search_site)
+    assert query == parse_sync("index", "python-*", "test", 0, 10, config.default_search_site)
 
 
-@pytest.mark.asyncio
-async def test_exact_search_for_synonym_terms():
-    query = await parse("index", "insight*", None, 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index insight SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
+def test_reuses_escaper_for_literal_terms(config):
+    literal_terms = config.default_search_site.literal_terms
+    assert get_escaper(literal_terms) is get_escaper(literal_terms)
 
 
-@pytest.mark.asyncio
-async def test_allow_fuzzy_search_for_non_synonym_terms():
-    query = await parse("index", "test*", None, 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index test* SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
-
+def test_computes_synonyms_once(config):
+    site = config.default_search_site
+    assert site.all_synonyms is site.all_synonyms
+    assert "insight" in site.all_synonyms
 
-@pytest.mark.asyncio
-async def test_boosts_current_section_if_given():
-    query = await parse("index", "test", "test", 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index ((@s:test) => {$weight: 10} test) | test SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
 
+def test_returns_a_new_list_for_cached_queries(config):
+    site = config.default_search_site
+    first = parse_sync("index", "redis", None, 0, 10, site)
+    hits = build_query.cache_info().hits
+    second = parse_sync("index", "redis", None, 0, 10, site)
+    assert build_query.cache_info().hits == hits + 1
+    assert first == second
+    assert first is not second
 
-@pytest.mark.asyncio
-async def test_escapes_configured_literal_terms():
-    query = await parse("index", "active-active", None, 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index active\\-active SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
 
-    query = await parse("index", "leader-follower active-active", None, 0, 10, config.default_search_site)
-    assert ' '.join(query) == "index leader\\-follower active\\-active SUMMARIZE FIELDS 1 body FRAGS 1 LEN 10 HIGHLIGHT FIELDS 3 title body section_title LIMIT 0 10"
\ No newline at end of file
+@pytest.mark.parametrize("query,section", [
+    ("redis " * MAX_CACHED_QUERY_LENGTH, None),
+    ("redis", "s" * (MAX_CACHED_QUERY_LENGTH + 1)),
+])
+def test_does_not_cache_long_queries(query, section, config):
+    size = build_query.cache_info().currsize
+    parse_sync("index", query, section, 0, 10, config.default_search_site)
+    assert build_query.cache_info().currsize == size